@@ -3,16 +3,26 @@
 # All-in-one SUMO project builder with left/right-hand driving, rich parameter coverage,
 # XML generation, project ZIP export, and basic analytics for outputs.
 
+import copy
 import io
-import json
+import sys
 import zipfile
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
-from xml.etree import ElementTree as ET
-from xml.dom import minidom
+
+try:
+    from lxml import etree as LET
+    XmlElement = LET._Element
+    HAS_LXML = True
+except ImportError:  # fall back to the stdlib ElementTree (pretty printing via ET.indent)
+    from xml.etree import ElementTree as LET
+    XmlElement = LET.Element
+    HAS_LXML = False
 
 # =============================
 # --------- BRANDING ---------
@@ -34,8 +44,11 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown(
-    f"""
+# Streamlit re-executes this script on every rerun, so the page chrome is built once
+# per server process and reused; the footer year is fixed at startup.
+@st.cache_resource
+def page_chrome() -> Tuple[str, str, str]:
+    css = f"""
 <style>
   .app-header {{
     background: linear-gradient(90deg, {PRIMARY} 0%, #ff7ab8 100%);
@@ -44,38 +57,108 @@ st.markdown(
   }}
   .box {{ background: {CARD}; border:1px solid rgba(255,255,255,.06); padding:16px; border-radius:14px; }}
   .muted {{ color:{MUTED}; font-size:12px; }}
-  .stTabs [data-baseweb="tab-list"] {{ gap: .5rem; }}
-  .stTabs [data-baseweb="tab"] {{ background:{CARD}; color:#e2e8f0; border-radius:10px; }}
-  .stTabs [aria-selected="true"] {{ background:{PRIMARY}; color:white; }}
   pre {{ white-space: pre-wrap; }}
 </style>
+"""
+    header = f"""
 <div class="app-header">
   <h2 style="margin:0;">🚦 {APP_TITLE}</h2>
   <div class="muted">{APP_TAGLINE} • Built by {BRAND_OWNER} • {INSTITUTION}</div>
 </div>
-""",
-    unsafe_allow_html=True,
-)
+"""
+    footer = f"<div class='muted'>© {datetime.now().year} {BRAND_OWNER} • {INSTITUTION} • {APP_TITLE}</div>"
+    return css, header, footer
+
+
+APP_CSS, APP_HEADER_HTML, APP_FOOTER_HTML = page_chrome()
+
+# Elements not emitted during a run are removed from the page, so the CSS is still sent
+# each rerun; st.html passes it through without the markdown parser.
+st.html(APP_CSS)
+st.markdown(APP_HEADER_HTML, unsafe_allow_html=True)
 
 # =============================
 # ---------- HELPERS ----------
 # =============================
 
+# Namespace constants are built (and interned) once instead of per xsd_root() call
+XSI_NS = sys.intern("http://www.w3.org/2001/XMLSchema-instance")
+XSI_NSMAP = {"xsi": XSI_NS}
+XSI_SCHEMA_LOCATION = sys.intern(f"{{{XSI_NS}}}noNamespaceSchemaLocation")
+if not HAS_LXML:
+    LET.register_namespace("xsi", XSI_NS)
+
+
 def prettify(xml_string: str) -> str:
+    # Legacy string-in/string-out wrapper; the builders serialize their trees directly.
     try:
-        return minidom.parseString(xml_string).toprettyxml(indent="  ")
+        if HAS_LXML:
+            parser = LET.XMLParser(remove_blank_text=True)
+            return LET.tostring(LET.fromstring(xml_string.encode(), parser), pretty_print=True, encoding="unicode")
+        root = LET.fromstring(xml_string)
+        LET.indent(root, space="  ")
+        return LET.tostring(root, encoding="unicode")
     except Exception:
         return xml_string
 
 
-def xsd_root(tag: str, xsd_url: str) -> ET.Element:
-    return ET.Element(
-        tag,
-        attrib={
-            "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
-            "xsi:noNamespaceSchemaLocation": xsd_url,
-        },
-    )
+def serialize_pretty(root: XmlElement) -> str:
+    if not HAS_LXML:
+        LET.indent(root, space="  ")
+        return serialize_compact(root)
+    return LET.tostring(root, pretty_print=True, xml_declaration=True, encoding="utf-8").decode("utf-8")
+
+
+def serialize_compact(root: XmlElement) -> str:
+    # SUMO ignores indentation, so exported files skip pretty printing entirely
+    return LET.tostring(root, xml_declaration=True, encoding="utf-8").decode("utf-8")
+
+
+def xsd_root(tag: str, xsd_url: str) -> XmlElement:
+    if not HAS_LXML:
+        return LET.Element(tag, {XSI_SCHEMA_LOCATION: xsd_url})
+    return LET.Element(tag, {XSI_SCHEMA_LOCATION: xsd_url}, nsmap=XSI_NSMAP)
+
+def str_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Whole-table string cast in one pandas pass (missing cells become ""), so the
+    # builders' row loops work on ready-made strings instead of calling str() per cell.
+    return df.astype(object).where(df.notna(), "").astype(str)
+
+
+def table_digest(df: pd.DataFrame) -> bytes:
+    # Cache key covering every row: Streamlit's default DataFrame hash samples large
+    # tables, so an edit outside the sample would keep serving stale XML.
+    header = repr((list(df.columns), [str(t) for t in df.dtypes])).encode()
+    return header + pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()
+
+
+def int_strings(df: pd.DataFrame, col: str, default: int) -> list:
+    if col not in df.columns:
+        return [str(default)] * len(df)
+    return pd.to_numeric(df[col]).fillna(default).astype("int64").astype(str).tolist()
+
+
+def iterparse_table(file, tag: str, numeric_attrs: Tuple[str, ...], id_attr: str = "") -> pd.DataFrame:
+    # Streams <tag> elements out of large SUMO outputs; each element is freed once read,
+    # so memory stays flat regardless of file size.
+    ids = []
+    cols = {k: [] for k in numeric_attrs}
+    if HAS_LXML:
+        events = LET.iterparse(file, tag=tag)
+    else:
+        events = ((ev, el) for ev, el in LET.iterparse(file) if el.tag == tag)
+    for _, elem in events:
+        if id_attr:
+            ids.append(elem.get(id_attr))
+        for k, values in cols.items():
+            values.append(elem.get(k, 0))
+        elem.clear()
+        while HAS_LXML and elem.getprevious() is not None:
+            del elem.getparent()[0]
+    data = {id_attr: ids} if id_attr else {}
+    data.update({k: np.asarray(v, dtype=np.float64) for k, v in cols.items()})
+    return pd.DataFrame(data)
+
 
 SCHEMAS = {
     "nodes": "http://sumo.dlr.de/xsd/nodes_file.xsd",
@@ -84,55 +167,57 @@ SCHEMAS = {
     "additional": "http://sumo.dlr.de/xsd/additional_file.xsd",
     "sumocfg": "http://sumo.dlr.de/xsd/sumoConfiguration.xsd",
 }
+SCHEMAS = {k: sys.intern(v) for k, v in SCHEMAS.items()}
 
 # =============================
 # ------ DEFAULT TABLES --------
 # =============================
+# Plain records; each session builds its own (Arrow-backed) DataFrames from them at init.
 
-default_nodes = pd.DataFrame([
+default_nodes = [
     {"id": "n1", "x": 0.0, "y": 0.0, "type": "priority"},
     {"id": "n2", "x": 100.0, "y": 0.0, "type": "priority"},
-])
+]
 
-default_edges = pd.DataFrame([
+default_edges = [
     {
         "id": "e1", "from": "n1", "to": "n2",
         "numLanes": 2, "speed": 13.89, "priority": 1,
         "laneWidth": 3.2, "allow": "", "disallow": "",
         "shape": "", "spreadType": "center", "endOffset": 0.0,
     }
-])
+]
 
 # Vehicle types with extensive parameters
 # (Users can add more rows or parameters as columns freely)
-default_vtypes = pd.DataFrame([
+default_vtypes = [
     {"id":"car","vClass":"passenger","color":"1,0,0","accel":2.6,"decel":4.5,"emergencyDecel":9.0,
      "length":5.0,"minGap":2.5,"maxSpeed":33.33,"sigma":0.5,"tau":1.0,"speedFactor":1.0,"speedDev":0.1,
      "carFollowModel":"IDM","lcStrategic":1.0,"lcCooperative":1.0,"lcKeepRight":0.8,"lcSpeedGain":1.0},
     {"id":"bus","vClass":"bus","color":"0,0,1","accel":1.2,"decel":4.0,"emergencyDecel":7.0,
      "length":12.0,"minGap":3.0,"maxSpeed":22.22,"sigma":0.5,"tau":1.2,"speedFactor":0.9,"speedDev":0.05,
      "carFollowModel":"Krauss","lcStrategic":1.0,"lcCooperative":1.0,"lcKeepRight":0.8,"lcSpeedGain":0.6}
-])
+]
 
-default_routes = pd.DataFrame([
+default_routes = [
     {"id": "r1", "edges": "e1"}
-])
+]
 
-default_flows = pd.DataFrame([
+default_flows = [
     {"id": "f1", "type": "car", "route": "r1", "begin": 0, "end": 3600, "vehsPerHour": 1000}
-])
+]
 
-default_trips = pd.DataFrame([
+default_trips = [
     {"id": "t1", "type": "car", "depart": 0, "from": "e1", "to": "e1"}
-])
+]
 
-default_e1 = pd.DataFrame([
+default_e1 = [
     {"id": "det1", "lane": "e1_0", "pos": 50.0, "freq": 60, "file": "e1_output.xml"}
-])
+]
 
-default_tl = pd.DataFrame([
+default_tl = [
     {"id": "tls1", "type": "static", "programID": "p1", "offset": 0, "phaseStates": "GrGr|yryr|rrrr", "durations": "30,4,30"}
-])
+]
 
 sim_defaults = {
     "begin": 0, "end": 3600, "stepLength": 0.1, "randomSeed": 42,
@@ -153,162 +238,204 @@ outputs_defaults = {
 # --------- STATE INIT --------
 # =============================
 ss = st.session_state
-if "nodes" not in ss: ss.nodes = default_nodes.copy()
-if "edges" not in ss: ss.edges = default_edges.copy()
-if "vtypes" not in ss: ss.vtypes = default_vtypes.copy()
-if "routes" not in ss: ss.routes = default_routes.copy()
-if "flows"  not in ss: ss.flows  = default_flows.copy()
-if "trips"  not in ss: ss.trips  = default_trips.copy()
-if "e1"     not in ss: ss.e1     = default_e1.copy()
-if "tl"     not in ss: ss.tl     = default_tl.copy()
+default_tables = {
+    "nodes": default_nodes, "edges": default_edges, "vtypes": default_vtypes, "routes": default_routes,
+    "flows": default_flows, "trips": default_trips, "e1": default_e1, "tl": default_tl,
+}
+# Arrow-backed frames: data_editor/session syncing works on immutable Arrow buffers
+# instead of copying NumPy blocks. Going through a pyarrow Table keeps each column's
+# declared type (convert_dtypes would turn 0.0/100.0 coordinates into int columns).
+for key, records in default_tables.items():
+    if key not in ss:
+        ss[key] = pa.Table.from_pylist(records).to_pandas(types_mapper=pd.ArrowDtype)
 if "sim"    not in ss: ss.sim    = sim_defaults.copy()
-if "outputs"not in ss: ss.outputs= json.loads(json.dumps(outputs_defaults))
+if "outputs"not in ss: ss.outputs= copy.deepcopy(outputs_defaults)
 if "driving_side" not in ss: ss.driving_side = "right"  # right or left
 
 # =============================
 # -------- XML BUILDERS --------
 # =============================
 
-def build_nodes_xml(nodes: pd.DataFrame) -> str:
+def build_nodes_xml(nodes: pd.DataFrame) -> XmlElement:
     root = xsd_root("nodes", SCHEMAS["nodes"])
-    for _, r in nodes.iterrows():
-        ET.SubElement(root, "node", id=str(r["id"]), x=str(r["x"]), y=str(r["y"]), type=str(r.get("type", "priority")))
-    return prettify(ET.tostring(root, encoding="unicode"))
+    for r in str_frame(nodes).itertuples(index=False):
+        LET.SubElement(root, "node", {"id": r.id, "x": r.x, "y": r.y, "type": getattr(r, "type", "priority")})
+    return root
+
 
+EDGE_OPTIONAL_ATTRS = ("laneWidth", "allow", "disallow", "shape", "spreadType", "endOffset")
 
-def build_edges_xml(edges: pd.DataFrame, driving: str) -> str:
+
+def build_edges_xml(edges: pd.DataFrame, driving: str) -> XmlElement:
     root = xsd_root("edges", SCHEMAS["edges"])
     # Informational comment (true left-hand geometry/priority is determined during netconvert with --lefthand)
-    root.insert(0, ET.Comment(f"Driving side: {driving}-hand (use --lefthand in netconvert if needed)"))
-    for _, r in edges.iterrows():
+    root.insert(0, LET.Comment(f"Driving side: {driving}-hand (enable the netconvert lefthand option if needed)"))
+    es = str_frame(edges)
+    lanes = int_strings(edges, "numLanes", 1)
+    priorities = int_strings(edges, "priority", 1)
+    # Decide which optional cells are set in one vectorised pass per column (blank and NaN are skipped)
+    opt_keys = [k for k in EDGE_OPTIONAL_ATTRS if k in es.columns]
+    opt_set = {k: es[k].ne("").to_numpy() for k in opt_keys}
+    for i, (r, n_lanes, priority) in enumerate(zip(es.to_dict("records"), lanes, priorities)):
         attrib = {
-            "id": str(r["id"]), "from": str(r["from"]), "to": str(r["to"]),
-            "numLanes": str(int(r.get("numLanes", 1))), "speed": str(r.get("speed", 13.89)),
-            "priority": str(int(r.get("priority", 1))),
+            "id": r["id"], "from": r["from"], "to": r["to"],
+            "numLanes": n_lanes, "speed": r.get("speed", "13.89"),
+            "priority": priority,
         }
-        for opt in ("laneWidth","allow","disallow","shape","spreadType","endOffset"):
-            val = r.get(opt, "")
-            if str(val) != "":
-                attrib[opt] = str(val)
-        ET.SubElement(root, "edge", attrib)
-    return prettify(ET.tostring(root, encoding="unicode"))
+        for k in opt_keys:
+            if opt_set[k][i]:
+                attrib[k] = r[k]
+        LET.SubElement(root, "edge", attrib)
+    return root
 
 
-def build_routes_xml(vtypes: pd.DataFrame, routes: pd.DataFrame, flows: pd.DataFrame, trips: pd.DataFrame) -> str:
+def build_routes_xml(vtypes: pd.DataFrame, routes: pd.DataFrame, flows: pd.DataFrame, trips: pd.DataFrame) -> XmlElement:
     root = xsd_root("routes", SCHEMAS["routes"])
     # vTypes
-    for _, v in vtypes.iterrows():
-        attrib = {k: str(v.get(k)) for k in v.index if str(v.get(k)) != ""}
-        attrib["id"] = str(v["id"])  # ensure id present
-        ET.SubElement(root, "vType", attrib)
+    vt = str_frame(vtypes)
+    for row in vt.itertuples(index=False, name=None):
+        attrib = {k: val for k, val in zip(vt.columns, row) if val != ""}
+        attrib.setdefault("id", "")  # ensure id present
+        LET.SubElement(root, "vType", attrib)
     # routes
-    for _, r in routes.iterrows():
-        ET.SubElement(root, "route", id=str(r["id"]), edges=str(r.get("edges", "")).strip())
+    for r in str_frame(routes).to_dict("records"):
+        LET.SubElement(root, "route", {"id": r["id"], "edges": r.get("edges", "").strip()})
     # flows
-    for _, f in flows.iterrows():
+    begins = int_strings(flows, "begin", 0)
+    ends = int_strings(flows, "end", 3600)
+    rates = int_strings(flows, "vehsPerHour", 1000)
+    for f, begin, end, rate in zip(str_frame(flows).to_dict("records"), begins, ends, rates):
         attrib = {
-            "id": str(f["id"]),
-            "type": str(f.get("type", "car")),
-            "route": str(f.get("route", "")),
-            "begin": str(int(f.get("begin", 0))),
-            "end": str(int(f.get("end", 3600))),
-            "vehsPerHour": str(int(f.get("vehsPerHour", 1000))),
+            "id": f["id"],
+            "type": f.get("type", "car"),
+            "route": f.get("route", ""),
+            "begin": begin,
+            "end": end,
+            "vehsPerHour": rate,
         }
-        ET.SubElement(root, "flow", attrib)
+        LET.SubElement(root, "flow", attrib)
     # trips
-    for _, t in trips.iterrows():
-        attrib = {k: str(t.get(k)) for k in ["id","type","depart","from","to"] if str(t.get(k, "")) != ""}
+    for t in str_frame(trips).to_dict("records"):
+        attrib = {k: t[k] for k in ["id","type","depart","from","to"] if t.get(k, "") != ""}
         if "id" in attrib:
-            ET.SubElement(root, "trip", attrib)
-    return prettify(ET.tostring(root, encoding="unicode"))
+            LET.SubElement(root, "trip", attrib)
+    return root
 
 
-def build_additional_xml(e1_det: pd.DataFrame, tl: pd.DataFrame) -> str:
+def build_additional_xml(e1_det: pd.DataFrame, tl: pd.DataFrame) -> XmlElement:
     root = xsd_root("additional", SCHEMAS["additional"])
     # e1 detectors
-    for _, d in e1_det.iterrows():
-        ET.SubElement(
+    freqs = int_strings(e1_det, "freq", 60)
+    for d, freq in zip(str_frame(e1_det).to_dict("records"), freqs):
+        LET.SubElement(
             root,
             "e1Detector",
             {
-                "id": str(d.get("id", "det")),
-                "lane": str(d.get("lane", "")),
-                "pos": str(d.get("pos", 0)),
-                "freq": str(int(d.get("freq", 60))),
-                "file": str(d.get("file", "e1_output.xml")),
+                "id": d.get("id", "det"),
+                "lane": d.get("lane", ""),
+                "pos": d.get("pos", "0"),
+                "freq": freq,
+                "file": d.get("file", "e1_output.xml"),
             },
         )
     # traffic lights (simple fixed-time program)
-    for _, s in tl.iterrows():
-        tl_elem = ET.SubElement(
+    tl_str = str_frame(tl)
+    offsets = int_strings(tl, "offset", 0)
+    # Tokenise the phase/duration strings for the whole column at once
+    state_lists = tl_str.get("phaseStates", pd.Series("GrGr", index=tl.index, dtype=object)).str.split("|")
+    dur_lists = tl_str.get("durations", pd.Series("30", index=tl.index, dtype=object)).str.split(",")
+    for s, offset, state_parts, dur_parts in zip(tl_str.to_dict("records"), offsets, state_lists, dur_lists):
+        tl_elem = LET.SubElement(
             root,
             "tlLogic",
             {
-                "id": str(s.get("id", "tls1")),
-                "type": str(s.get("type", "static")),
-                "programID": str(s.get("programID", "p1")),
-                "offset": str(int(s.get("offset", 0))),
+                "id": s.get("id", "tls1"),
+                "type": s.get("type", "static"),
+                "programID": s.get("programID", "p1"),
+                "offset": offset,
             },
         )
-        states = [x.strip() for x in str(s.get("phaseStates", "GrGr")).split("|") if x.strip()]
-        durs = [int(x.strip()) for x in str(s.get("durations", "30")).split(",") if x.strip()]
-        if not states:
-            states = ["GrGr"]
-        if not durs:
-            durs = [30]
+        states = [x.strip() for x in state_parts if x.strip()] or ["GrGr"]
+        durs = [int(x) for x in dur_parts if x.strip()] or [30]
         for i, stt in enumerate(states):
             dur = durs[i] if i < len(durs) else durs[-1]
-            ET.SubElement(tl_elem, "phase", duration=str(dur), state=stt)
-    return prettify(ET.tostring(root, encoding="unicode"))
+            LET.SubElement(tl_elem, "phase", {"duration": str(dur), "state": stt})
+    return root
+
+
+# (outputs key, sumocfg option, frequency option, default frequency)
+OUTPUT_SPECS = (
+    ("tripinfo", "tripinfo-output", None, None),
+    ("fcd", "fcd-output", "fcd-output.step", 1),
+    ("emissions", "emission-output", "emission-output.step", 60),
+    ("summary", "summary-output", "summary-output.step", 60),
+    ("edgedata", "edgeData-output", "edgeData-output.period", 60),
+    ("lanedata", "laneData-output", "laneData-output.period", 60),
+)
 
 
-def build_sumocfg_xml(net_file: str, routes_file: str, additional_file: str, sim: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+def build_sumocfg_xml(net_file: str, routes_file: str, additional_file: str, sim: Dict[str, Any], outputs: Dict[str, Any]) -> XmlElement:
     root = xsd_root("configuration", SCHEMAS["sumocfg"])
 
-    input_node = ET.SubElement(root, "input")
-    ET.SubElement(input_node, "net-file", value=net_file)
-    ET.SubElement(input_node, "route-files", value=routes_file)
+    input_node = LET.SubElement(root, "input")
+    LET.SubElement(input_node, "net-file", value=net_file)
+    LET.SubElement(input_node, "route-files", value=routes_file)
     if additional_file:
-        ET.SubElement(input_node, "additional-files", value=additional_file)
-
-    time_node = ET.SubElement(root, "time")
-    ET.SubElement(time_node, "begin", value=str(sim.get("begin", 0)))
-    ET.SubElement(time_node, "end", value=str(sim.get("end", 3600)))
-    ET.SubElement(time_node, "step-length", value=str(sim.get("stepLength", 0.1)))
-
-    proc_node = ET.SubElement(root, "processing")
-    ET.SubElement(proc_node, "lateral-resolution", value=str(sim.get("lateralResolution", 0.8)))
-
-    sim_node = ET.SubElement(root, "simulation")
-    ET.SubElement(sim_node, "time-to-teleport", value=str(sim.get("timeToTeleport", 300)))
-
-    coll_node = ET.SubElement(root, "collision")
-    ET.SubElement(coll_node, "action", value=str(sim.get("collisionAction", "warn")))
-
-    report_node = ET.SubElement(root, "report")
-    ET.SubElement(report_node, "verbose", value="true")
-    ET.SubElement(report_node, "no-step-log", value="false")
-
-    out_node = ET.SubElement(root, "output")
-    if outputs.get("tripinfo", {}).get("enabled"):
-        ET.SubElement(out_node, "tripinfo-output", value=outputs["tripinfo"]["file"])
-    if outputs.get("fcd", {}).get("enabled"):
-        ET.SubElement(out_node, "fcd-output", value=outputs["fcd"]["file"])
-        ET.SubElement(out_node, "fcd-output.step", value=str(outputs["fcd"].get("freq", 1)))
-    if outputs.get("emissions", {}).get("enabled"):
-        ET.SubElement(out_node, "emission-output", value=outputs["emissions"]["file"])
-        ET.SubElement(out_node, "emission-output.step", value=str(outputs["emissions"].get("freq", 60)))
-    if outputs.get("summary", {}).get("enabled"):
-        ET.SubElement(out_node, "summary-output", value=outputs["summary"]["file"])
-        ET.SubElement(out_node, "summary-output.step", value=str(outputs["summary"].get("freq", 60)))
-    if outputs.get("edgedata", {}).get("enabled"):
-        ET.SubElement(out_node, "edgeData-output", value=outputs["edgedata"]["file"])
-        ET.SubElement(out_node, "edgeData-output.period", value=str(outputs["edgedata"].get("freq", 60)))
-    if outputs.get("lanedata", {}).get("enabled"):
-        ET.SubElement(out_node, "laneData-output", value=outputs["lanedata"]["file"])
-        ET.SubElement(out_node, "laneData-output.period", value=str(outputs["lanedata"].get("freq", 60)))
-
-    return prettify(ET.tostring(root, encoding="unicode"))
+        LET.SubElement(input_node, "additional-files", value=additional_file)
+
+    time_node = LET.SubElement(root, "time")
+    LET.SubElement(time_node, "begin", value=str(sim.get("begin", 0)))
+    LET.SubElement(time_node, "end", value=str(sim.get("end", 3600)))
+    LET.SubElement(time_node, "step-length", value=str(sim.get("stepLength", 0.1)))
+
+    proc_node = LET.SubElement(root, "processing")
+    LET.SubElement(proc_node, "lateral-resolution", value=str(sim.get("lateralResolution", 0.8)))
+
+    sim_node = LET.SubElement(root, "simulation")
+    LET.SubElement(sim_node, "time-to-teleport", value=str(sim.get("timeToTeleport", 300)))
+
+    coll_node = LET.SubElement(root, "collision")
+    LET.SubElement(coll_node, "action", value=str(sim.get("collisionAction", "warn")))
+
+    report_node = LET.SubElement(root, "report")
+    LET.SubElement(report_node, "verbose", value="true")
+    LET.SubElement(report_node, "no-step-log", value="false")
+
+    out_node = LET.SubElement(root, "output")
+    for key, tag, freq_tag, default_freq in OUTPUT_SPECS:
+        cfg = outputs.get(key)
+        if not cfg or not cfg.get("enabled"):
+            continue
+        LET.SubElement(out_node, tag, value=cfg["file"])
+        if freq_tag:
+            LET.SubElement(out_node, freq_tag, value=str(cfg.get("freq", default_freq)))
+
+    return root
+
+
+XML_BUILDERS = {
+    "nodes": build_nodes_xml,
+    "edges": build_edges_xml,
+    "routes": build_routes_xml,
+    "additional": build_additional_xml,
+    "sumocfg": build_sumocfg_xml,
+}
+
+
+@st.cache_data(max_entries=32, hash_funcs={pd.DataFrame: table_digest})
+def render_xml(kind: str, *args, pretty: bool = True) -> str:
+    root = XML_BUILDERS[kind](*args)
+    return serialize_pretty(root) if pretty else serialize_compact(root)
+
+
+@st.cache_data(max_entries=8)
+def build_project_zip(files: Dict[str, str]) -> bytes:
+    buf = io.BytesIO()
+    # Level 1 already captures most of the gain on repetitive XML at a fraction of the CPU
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
 
 # =============================
 # ------------- UI ------------
@@ -330,52 +457,88 @@ with st.sidebar:
     st.code(f"netconvert -n nodes.nod.xml -e edges.edg.xml -o {net_name}{lefthand_flag}")
     st.code(f"sumo -c {cfg_name}")
 
-main_tabs = st.tabs([
-    "Network", "Edges", "Vehicles & Routes", "Traffic Controls", "Simulation", "Outputs", "XML & Export", "Analytics"
-])
+EDITOR_PAGE_SIZE = 200
+
+
+def restore_dtypes(edited: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    # data_editor returns columns that gained added rows as object dtype; cast them back
+    # so the session tables stay Arrow-backed.
+    changed = {c: t for c, t in dtypes.items() if c in edited.columns and edited[c].dtype != t}
+    if not changed:
+        return edited
+    try:
+        return edited.astype(changed)
+    except (TypeError, ValueError, pa.ArrowException):
+        return edited
+
+
+def table_editor(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    # Large tables are edited one page at a time so each rerun ships at most
+    # EDITOR_PAGE_SIZE rows to the browser; small tables keep the plain editor.
+    if len(df) <= EDITOR_PAGE_SIZE:
+        edited = st.data_editor(df, num_rows="dynamic", use_container_width=True, key=key)
+        return restore_dtypes(edited, df.dtypes)
+    n_pages = -(-len(df) // EDITOR_PAGE_SIZE)
+    page_key = f"{key}_page"
+    if ss.get(page_key, 1) > n_pages:
+        ss[page_key] = n_pages
+    page = st.number_input(f"Page (of {n_pages}, {EDITOR_PAGE_SIZE} rows each)", 1, n_pages, 1, key=page_key)
+    start = (page - 1) * EDITOR_PAGE_SIZE
+    stop = start + EDITOR_PAGE_SIZE
+    edited = st.data_editor(df.iloc[start:stop], num_rows="dynamic", use_container_width=True, key=f"{key}_p{page}")
+    edited = restore_dtypes(edited, df.dtypes)
+    return pd.concat([df.iloc[:start], edited, df.iloc[stop:]], ignore_index=True)
+
+
+# Sections are switched with a radio rather than st.tabs: tabs execute every panel on
+# each rerun, whereas only the selected section (e.g. XML generation) needs to run.
+SECTIONS = ["Network", "Edges", "Vehicles & Routes", "Traffic Controls", "Simulation", "Outputs", "XML & Export", "Analytics"]
+active = st.radio("Section", SECTIONS, horizontal=True, key="active_section", label_visibility="collapsed")
+if active != "XML & Export":
+    ss.pop("project_zip", None)  # tables may change elsewhere, which would leave a prepared ZIP stale
 
 # ---------- Network ----------
-with main_tabs[0]:
+if active == "Network":
     st.subheader("🗺️ Nodes")
     st.caption("Define intersections and reference points.")
-    ss.nodes = st.data_editor(ss.nodes, num_rows="dynamic", use_container_width=True, key="nodes_table")
+    ss.nodes = table_editor(ss.nodes, "nodes_table")
 
 # ---------- Edges ----------
-with main_tabs[1]:
+if active == "Edges":
     st.subheader("🛣️ Edges (links between nodes)")
     st.caption("Set lanes, speed, lane width, allow/disallow, shape, etc.")
-    ss.edges = st.data_editor(ss.edges, num_rows="dynamic", use_container_width=True, key="edges_table")
+    ss.edges = table_editor(ss.edges, "edges_table")
 
 # ----- Vehicles & Routes -----
-with main_tabs[2]:
+if active == "Vehicles & Routes":
     st.subheader("🚗 Vehicle Types (vType)")
-    ss.vtypes = st.data_editor(ss.vtypes, num_rows="dynamic", use_container_width=True, key="vtypes_table")
+    ss.vtypes = table_editor(ss.vtypes, "vtypes_table")
 
     st.markdown("---")
     c1, c2 = st.columns(2)
     with c1:
         st.markdown("**Routes** (space-separated edge IDs)")
-        ss.routes = st.data_editor(ss.routes, num_rows="dynamic", use_container_width=True, key="routes_table")
+        ss.routes = table_editor(ss.routes, "routes_table")
     with c2:
         st.markdown("**Flows**")
-        ss.flows = st.data_editor(ss.flows, num_rows="dynamic", use_container_width=True, key="flows_table")
+        ss.flows = table_editor(ss.flows, "flows_table")
 
     st.markdown("---")
     st.markdown("**Trips** (optional explicit OD trips)")
-    ss.trips = st.data_editor(ss.trips, num_rows="dynamic", use_container_width=True, key="trips_table")
+    ss.trips = table_editor(ss.trips, "trips_table")
 
 # ------ Traffic Controls ------
-with main_tabs[3]:
+if active == "Traffic Controls":
     st.subheader("🚦 Traffic Lights (fixed-time)")
     st.caption("phaseStates example: GrGr|yryr|rrrr with durations e.g., 30,4,30")
-    ss.tl = st.data_editor(ss.tl, num_rows="dynamic", use_container_width=True, key="tl_table")
+    ss.tl = table_editor(ss.tl, "tl_table")
 
     st.markdown("---")
     st.subheader("🧲 Detectors — E1 (induction loops)")
-    ss.e1 = st.data_editor(ss.e1, num_rows="dynamic", use_container_width=True, key="e1_table")
+    ss.e1 = table_editor(ss.e1, "e1_table")
 
 # --------- Simulation ---------
-with main_tabs[4]:
+if active == "Simulation":
     st.subheader("⚙️ Simulation Settings")
     c1, c2, c3, c4 = st.columns(4)
     with c1:
@@ -404,7 +567,7 @@ with main_tabs[4]:
         ss.sim["collisionAction"] = st.selectbox("collision.action", ["none", "teleport", "remove", "warn"], index=["none","teleport","remove","warn"].index(ss.sim["collisionAction"]))
 
 # ---------- Outputs -----------
-with main_tabs[5]:
+if active == "Outputs":
     st.subheader("📤 Outputs Manager")
 
     def output_row(name: str, cfg: Dict[str, Any]):
@@ -420,36 +583,28 @@ with main_tabs[5]:
         output_row(k, ss.outputs[k])
 
 # ------- XML & Export ---------
-with main_tabs[6]:
+if active == "XML & Export":
     st.subheader("🧩 XML Generation & Export")
 
-    nodes_xml = build_nodes_xml(ss.nodes)
-    edges_xml = build_edges_xml(ss.edges, ss.driving_side)
-    routes_xml = build_routes_xml(ss.vtypes, ss.routes, ss.flows, ss.trips)
-    additional_xml = build_additional_xml(ss.e1, ss.tl)
-    sumocfg_xml = build_sumocfg_xml(net_name, rou_name, add_name, ss.sim, ss.outputs)
-
-    with st.expander("nodes.nod.xml"):
-        st.code(nodes_xml, language="xml")
-    with st.expander("edges.edg.xml"):
-        st.code(edges_xml, language="xml")
-    with st.expander("routes.rou.xml"):
-        st.code(routes_xml, language="xml")
-    with st.expander("additional.add.xml"):
-        st.code(additional_xml, language="xml")
-    with st.expander("simulation.sumocfg", expanded=True):
-        st.code(sumocfg_xml, language="xml")
+    xml_inputs = {
+        "nodes.nod.xml": ("nodes", ss.nodes),
+        "edges.edg.xml": ("edges", ss.edges, ss.driving_side),
+        "routes.rou.xml": ("routes", ss.vtypes, ss.routes, ss.flows, ss.trips),
+        "additional.add.xml": ("additional", ss.e1, ss.tl),
+        "simulation.sumocfg": ("sumocfg", net_name, rou_name, add_name, ss.sim, ss.outputs),
+    }
+
+    if st.toggle("Preview generated XML", value=True, key="xml_preview"):
+        for fname, (kind, *args) in xml_inputs.items():
+            with st.expander(fname, expanded=fname == "simulation.sumocfg"):
+                st.code(render_xml(kind, *args), language="xml")
 
     st.markdown("---")
     st.subheader("📦 Export Project ZIP")
-    zip_name = f"{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("nodes.nod.xml", nodes_xml)
-        zf.writestr("edges.edg.xml", edges_xml)
-        zf.writestr("routes.rou.xml", routes_xml)
-        zf.writestr("additional.add.xml", additional_xml)
-        zf.writestr("simulation.sumocfg", sumocfg_xml)
+    # The archive (and its timestamped name) is only built on request; it is discarded when
+    # the user leaves this section or changes a sidebar setting.
+    sidebar_settings = (project_name, driving, net_name, rou_name, add_name, cfg_name)
+    if st.button("📦 Prepare project ZIP"):
         readme = (
             f"# {APP_TITLE}\n"
             f"Project: {project_name}\n\n"
@@ -460,17 +615,22 @@ with main_tabs[6]:
             "Notes:\n- Left-hand countries require the --lefthand flag at net conversion stage.\n"
             "- Ensure edge lane IDs (e.g., e1_0) match detector lane inputs.\n"
         )
-        zf.writestr("README.txt", readme)
-
-    st.download_button(
-        "⬇️ Download Project ZIP",
-        data=buf.getvalue(),
-        file_name=zip_name,
-        mime="application/zip",
-    )
+        files = {fname: render_xml(kind, *args, pretty=False) for fname, (kind, *args) in xml_inputs.items()}
+        files["README.txt"] = readme
+        zip_name = f"{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        ss.project_zip = (sidebar_settings, build_project_zip(files), zip_name)
+
+    if ss.get("project_zip") and ss.project_zip[0] == sidebar_settings:
+        _, zip_bytes, zip_name = ss.project_zip
+        st.download_button(
+            "⬇️ Download Project ZIP",
+            data=zip_bytes,
+            file_name=zip_name,
+            mime="application/zip",
+        )
 
 # ---------- Analytics ---------
-with main_tabs[7]:
+if active == "Analytics":
     st.subheader("📈 Analytics — Load SUMO Outputs")
     st.caption("Drop tripinfo.xml / summary.xml to visualize key indicators.")
 
@@ -479,59 +639,48 @@ with main_tabs[7]:
 
     def parse_tripinfo_xml(file) -> pd.DataFrame:
         try:
-            content = file.read()
-            root = ET.fromstring(content)
-            rows = []
-            for t in root.findall("tripinfo"):
-                rows.append({
-                    "id": t.get("id"),
-                    "depart": float(t.get("depart", 0)),
-                    "duration": float(t.get("duration", 0)),
-                    "routeLength": float(t.get("routeLength", 0)),
-                    "waitingTime": float(t.get("waitingTime", 0)),
-                    "waitingCount": float(t.get("waitingCount", 0)),
-                    "departDelay": float(t.get("departDelay", 0)),
-                })
-            return pd.DataFrame(rows)
+            return iterparse_table(
+                file, "tripinfo",
+                ("depart", "duration", "routeLength", "waitingTime", "waitingCount", "departDelay"),
+                id_attr="id",
+            )
         except Exception as e:
             st.error(f"Failed to parse tripinfo: {e}")
             return pd.DataFrame()
 
     def parse_summary_xml(file) -> pd.DataFrame:
         try:
-            content = file.read()
-            root = ET.fromstring(content)
-            rows = []
-            for s in root.findall("step"):
-                rows.append({
-                    "time": float(s.get("time", 0)),
-                    "loaded": float(s.get("loaded", 0)),
-                    "inserted": float(s.get("inserted", 0)),
-                    "running": float(s.get("running", 0)),
-                    "waiting": float(s.get("waiting", 0)),
-                    "ended": float(s.get("ended", 0)),
-                    "meanTravelTime": float(s.get("meanTravelTime", 0)),
-                })
-            return pd.DataFrame(rows)
+            return iterparse_table(
+                file, "step",
+                ("time", "loaded", "inserted", "running", "waiting", "ended", "meanTravelTime"),
+            )
         except Exception as e:
             st.error(f"Failed to parse summary: {e}")
             return pd.DataFrame()
 
-    if up_tripinfo is not None:
-        df_ti = parse_tripinfo_xml(up_tripinfo)
-        if not df_ti.empty:
-            st.write("Tripinfo sample:", df_ti.head())
-            st.metric("Avg travel time (s)", f"{df_ti['duration'].mean():.2f}")
-            st.metric("Avg waiting time (s)", f"{df_ti['waitingTime'].mean():.2f}")
-
-    if up_summary is not None:
-        df_sm = parse_summary_xml(up_summary)
-        if not df_sm.empty:
-            st.write("Summary sample:", df_sm.head())
-            st.line_chart(df_sm.set_index("time")["meanTravelTime"], use_container_width=True)
-
-st.markdown(
-    f"<div class='muted'>© {datetime.now().year} {BRAND_OWNER} • {INSTITUTION} • {APP_TITLE}</div>",
-    unsafe_allow_html=True,
-)
+    def load_upload(upload, state_key: str, parser):
+        # Uploaders are dropped while another section is shown, so the parsed table is kept
+        # in session state (and only re-parsed when a different file is uploaded).
+        if upload is not None and ss.get(state_key, (None,))[0] != upload.file_id:
+            ss[state_key] = (upload.file_id, upload.name, parser(upload))
+        if upload is None and state_key in ss:
+            name = ss[state_key][1]
+            cols = st.columns((4, 1))
+            cols[0].caption(f"Showing previously uploaded {name}.")
+            if cols[1].button("Clear", key=f"{state_key}_clear"):
+                del ss[state_key]
+        return ss[state_key][2] if state_key in ss else None
+
+    df_ti = load_upload(up_tripinfo, "tripinfo_upload", parse_tripinfo_xml)
+    if df_ti is not None and not df_ti.empty:
+        st.write("Tripinfo sample:", df_ti.head())
+        st.metric("Avg travel time (s)", f"{df_ti['duration'].mean():.2f}")
+        st.metric("Avg waiting time (s)", f"{df_ti['waitingTime'].mean():.2f}")
+
+    df_sm = load_upload(up_summary, "summary_upload", parse_summary_xml)
+    if df_sm is not None and not df_sm.empty:
+        st.write("Summary sample:", df_sm.head())
+        st.line_chart(df_sm.set_index("time")["meanTravelTime"], use_container_width=True)
+
+st.markdown(APP_FOOTER_HTML, unsafe_allow_html=True)
 